@@ -11,15 +11,29 @@ import fitz
 from PIL import Image, ImageDraw, ImageFont
 import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
 
 
-def create_large_test_pdf(output_path: str = "large_test.pdf"):
+# Load the default font once per process, fall back to basic if not available
+try:
+    _DEFAULT_FONT = ImageFont.load_default()
+except Exception:
+    _DEFAULT_FONT = None
+
+
+def create_large_test_pdf(output_path: str = "large_test.pdf", page_count: int = 5):
     """Create a test PDF with multiple pages and images."""
     
+    # Generate and encode the page images in parallel; only the cheap
+    # PDF assembly below has to run in this process
+    with ProcessPoolExecutor() as executor:
+        page_images = dict(executor.map(encode_test_image, range(page_count)))
+    
     doc = fitz.open()
     
-    # Create 5 pages with different content
-    for page_num in range(5):
+    # Create pages with different content
+    for page_num in range(page_count):
         page = doc.new_page()
         
         # Add title text
@@ -30,17 +44,9 @@ def create_large_test_pdf(output_path: str = "large_test.pdf"):
         description = f"This is page {page_num + 1} of the test document. " * 5
         page.insert_text((50, 100), description, fontsize=12)
         
-        # Create and insert a test image
-        test_image = create_test_image(page_num)
-        
-        # Convert PIL image to bytes
-        img_buffer = io.BytesIO()
-        test_image.save(img_buffer, format='PNG')
-        img_data = img_buffer.getvalue()
-        
-        # Insert image on page
+        # Insert the pre-rendered test image on page
         img_rect = fitz.Rect(50, 150, 300, 400)
-        page.insert_image(img_rect, stream=img_data)
+        page.insert_image(img_rect, stream=page_images[page_num])
         
         # Add more text below image
         footer_text = f"Page {page_num + 1} footer content. " * 10
@@ -56,35 +62,40 @@ def create_large_test_pdf(output_path: str = "large_test.pdf"):
     return output_path
 
 
+def encode_test_image(page_num: int) -> Tuple[int, bytes]:
+    """Create the test image for a page and encode it for insertion."""
+    
+    test_image = create_test_image(page_num)
+    
+    # Convert PIL image to bytes
+    img_buffer = io.BytesIO()
+    test_image.save(img_buffer, format='JPEG', quality=85, optimize=False, progressive=False)
+    
+    return page_num, img_buffer.getvalue()
+
+
 def create_test_image(page_num: int) -> Image.Image:
     """Create a test image for the PDF."""
     
     # Create a colorful image
     width, height = 400, 300
-    image = Image.new('RGB', (width, height), color='white')
-    draw = ImageDraw.Draw(image)
+    block = 20
     
     # Draw colorful rectangles
     colors = ['red', 'green', 'blue', 'yellow', 'purple']
     color = colors[page_num % len(colors)]
     
-    # Draw gradient-like rectangles
-    for i in range(0, width, 20):
-        for j in range(0, height, 20):
-            # Create varying shades
-            shade = (i + j) % 255
-            rect_color = (shade, shade // 2, (255 - shade) % 255)
-            draw.rectangle([i, j, i + 19, j + 19], fill=rect_color)
+    # Build the gradient-like rectangles as one pixel per block, then blow it
+    # up with a single nearest-neighbour resize instead of drawing each block
+    shades = [(i + j) % 255 for j in range(0, height, block) for i in range(0, width, block)]
+    gradient = Image.new('RGB', (width // block, height // block))
+    gradient.putdata([(shade, shade // 2, (255 - shade) % 255) for shade in shades])
+    image = gradient.resize((width, height), Image.Resampling.NEAREST)
+    draw = ImageDraw.Draw(image)
     
     # Draw some text on the image
-    try:
-        # Try to use a default font, fall back to basic if not available
-        font = ImageFont.load_default()
-    except:
-        font = None
-    
-    draw.text((50, 50), f"Test Image {page_num + 1}", fill='black', font=font)
-    draw.text((50, 100), "This is a test image with various colors", fill='white', font=font)
+    draw.text((50, 50), f"Test Image {page_num + 1}", fill='black', font=_DEFAULT_FONT)
+    draw.text((50, 100), "This is a test image with various colors", fill='white', font=_DEFAULT_FONT)
     
     # Draw some shapes
     draw.ellipse([200, 150, 350, 250], fill=color, outline='black', width=3)
@@ -114,7 +125,7 @@ def main():
     draw.text((50, 75), "Test", fill='white')
     
     img_buffer = io.BytesIO()
-    simple_image.save(img_buffer, format='PNG')
+    simple_image.save(img_buffer, format='JPEG', quality=85, optimize=False, progressive=False)
     img_data = img_buffer.getvalue()
     
     img_rect = fitz.Rect(50, 150, 250, 300)
@@ -129,8 +140,8 @@ def main():
     
     print("\n✅ Test PDFs created successfully!")
     print("\n🧪 You can now test compression with:")
-    print(f"   python pdf_compressor.py {large_pdf} -s 1.0")
-    print(f"   python pdf_compressor.py {small_pdf_path} -s 0.1")
+    print(f"   python pdf_compressor.py {large_pdf} -s 0.05")
+    print(f"   python pdf_compressor.py {small_pdf_path} -s 0.005")
 
 
 if __name__ == "__main__":
@@ -13,6 +13,14 @@ from pdf_utils import PDFAnalyzer, PDFOptimizer
 import os
 
 
+def safe_size(path: str) -> int:
+    """Return the size of a file in bytes, or 0 if it does not exist."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
 def example_basic_compression():
     """Example of basic PDF compression usage."""
     print("=== Basic PDF Compression Example ===")
@@ -78,7 +86,7 @@ def example_advanced_compression():
         
         # Try with metadata removal
         metadata_output = "sample_no_metadata.pdf"
-        PDFOptimizer.remove_metadata(input_file, metadata_output)
+        PDFOptimizer.remove_metadata(input_file, metadata_output, aggressive=True)
         
         # Try flattening for maximum compression
         flattened_output = "sample_flattened.pdf"
@@ -90,9 +98,9 @@ def example_advanced_compression():
         
         results = [
             ("Original", input_file, original_size),
-            ("Basic compression", basic_output, os.path.getsize(basic_output) if os.path.exists(basic_output) else 0),
-            ("No metadata", metadata_output, os.path.getsize(metadata_output) if os.path.exists(metadata_output) else 0),
-            ("Flattened", flattened_output, os.path.getsize(flattened_output) if os.path.exists(flattened_output) else 0)
+            ("Basic compression", basic_output, safe_size(basic_output)),
+            ("No metadata", metadata_output, safe_size(metadata_output)),
+            ("Flattened", flattened_output, safe_size(flattened_output))
         ]
         
         for name, path, size in results:
@@ -11,29 +11,165 @@ Author: AI Assistant
 import os
 import sys
 import argparse
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 
 import fitz  # PyMuPDF
 from PIL import Image
 import io
 
 
+logger = logging.getLogger(__name__)
+
+
+# Options for writing compressed PDFs: maximum garbage collection, deflate
+# every stream at maximum effort and pack objects into compressed object streams
+PDF_SAVE_OPTIONS = {
+    'garbage': 4,
+    'deflate': True,
+    'deflate_images': True,
+    'deflate_fonts': True,
+    'clean': True,
+    'use_objstms': True,
+    'compression_effort': 100,
+}
+
+
+def encode_jpeg(image: Image.Image, quality: int = 85, optimize: bool = True) -> bytes:
+    """
+    Encode an RGB image as an optimized, progressive JPEG.
+    
+    Chroma is always subsampled 4:2:0 (Pillow's default, also at high
+    qualities), which saves a lot of space at no visible cost for most
+    content.
+    
+    Args:
+        image: RGB image to encode
+        quality: JPEG quality (1-100)
+        optimize: Use progressive mode with optimized Huffman tables. When
+                  False, a baseline JPEG with standard tables is written,
+                  which is several times faster to encode but larger.
+        
+    Returns:
+        JPEG image data
+    """
+    output_buffer = io.BytesIO()
+    image.save(output_buffer, format='JPEG', quality=quality, optimize=optimize,
+               progressive=optimize, subsampling=2)
+    return output_buffer.getvalue()
+
+
+# Raw page raster: (width, height, RGB samples)
+Raster = Tuple[int, int, bytes]
+
+# Outcome of a compression search: the callable writing an attempt
+# (level, output path, optimize) and the level that fit the target
+SearchResult = Tuple[Callable[[int, str, bool], bool], int]
+
+
+def render_page(pdf_document: fitz.Document, page_num: int, matrix: fitz.Matrix) -> Raster:
+    """
+    Rasterize a single page to raw RGB samples.
+    
+    Any scaling is folded into `matrix`, so MuPDF samples the page at the
+    final resolution in one pass and no separate resize is needed.
+    
+    Args:
+        pdf_document: Open source document
+        page_num: Index of the page to render
+        matrix: Rendering matrix (shared across all pages of a render pass)
+        
+    Returns:
+        Tuple of (width, height, samples) for the rendered page
+    """
+    pix = pdf_document[page_num].get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
+    return pix.width, pix.height, pix.samples
+
+
+def raster_to_jpeg(raster: Raster, quality: int = 85, optimize: bool = True) -> bytes:
+    """
+    Encode a raw page raster (see render_page) as JPEG.
+    
+    Args:
+        raster: Tuple of (width, height, RGB samples)
+        quality: JPEG quality (1-100)
+        optimize: Spend extra time on a smaller file (see encode_jpeg)
+        
+    Returns:
+        JPEG image data
+    """
+    width, height, samples = raster
+    image = Image.frombuffer('RGB', (width, height), samples, 'raw', 'RGB', 0, 1)
+    return encode_jpeg(image, quality, optimize)
+
+
+# Source document opened once per worker process (MuPDF documents cannot
+# be shared between processes). Every page-rendering process pool of the
+# package uses it, including the page flattening in pdf_utils.
+_worker_document = None
+
+
+def init_worker_document(input_path: str):
+    """Process pool initializer: open the source document in a new worker."""
+    global _worker_document
+    _worker_document = fitz.open(input_path)
+
+
+def worker_document() -> fitz.Document:
+    """Return the document opened by init_worker_document in this worker."""
+    return _worker_document
+
+
+def can_reopen(pdf_document: fitz.Document) -> bool:
+    """
+    Tell whether reopening a document's file yields the same document.
+    
+    Worker processes, and copies made of the file, only see what is saved
+    on disk: not documents opened from memory (even with a filename hint)
+    or whose file is gone, unsaved changes, or the authentication of a
+    password-protected document. Encrypted files are never reopened, even
+    once authenticated (is_encrypted is then False, but the metadata still
+    names the encryption; needs_pass is not used because querying it on an
+    authenticated document breaks MuPDF's decryption of it).
+    
+    Args:
+        pdf_document: Open document
+        
+    Returns:
+        True if the document can be reopened from its file by name
+    """
+    if pdf_document.stream is not None or not os.path.isfile(pdf_document.name or ''):
+        return False
+    return not (pdf_document.is_dirty or pdf_document.is_encrypted
+                or (pdf_document.metadata or {}).get('encryption'))
+
+
+def _render_worker_page(page_num: int, matrix: fitz.Matrix) -> Tuple[int, Raster]:
+    """Rasterize one page of the worker's document for render_pages."""
+    return page_num, render_page(worker_document(), page_num, matrix)
+
+
 class PDFCompressor:
     """
     A class to compress PDF files by reducing DPI and dimensions.
     """
     
-    def __init__(self, target_size_mb: float = 1.0):
+    def __init__(self, target_size_mb: float = 1.0, max_workers: Optional[int] = None):
         """
         Initialize the PDF compressor.
         
         Args:
             target_size_mb: Target file size in megabytes (default: 1.0)
+            max_workers: Number of processes used to render pages
+                         (default: number of CPUs, 1 disables multiprocessing)
         """
         self.target_size_bytes = target_size_mb * 1024 * 1024
         self.quality_levels = [95, 85, 75, 65, 50, 40, 30, 20]
         self.scale_factors = [1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
+        self.max_workers = max_workers or os.cpu_count() or 1
         
     def get_file_size(self, file_path: str) -> int:
         """Get file size in bytes."""
@@ -48,6 +184,44 @@ class PDFCompressor:
         else:
             return f"{size_bytes / (1024 * 1024):.1f} MB"
     
+    def render_pages(self, pdf_document: fitz.Document,
+                     page_numbers: List[int], zoom: float) -> Dict[int, Raster]:
+        """
+        Rasterize pages, in parallel when more than one page is requested.
+        
+        Each worker process opens its own copy of the document's file; results
+        are returned keyed by page number so the caller can assemble the output
+        document in order. Documents that cannot be reopened from their file
+        (see can_reopen) are rendered serially.
+        
+        Args:
+            pdf_document: Open input document
+            page_numbers: Indices of the pages to render
+            zoom: Rendering zoom factor (1.0 = 72 DPI)
+            
+        Returns:
+            Dictionary mapping page number to its raster (width, height, samples)
+        """
+        workers = min(self.max_workers, len(page_numbers))
+        if not can_reopen(pdf_document):
+            workers = 1
+        matrix = fitz.Matrix(zoom, zoom)
+        
+        if workers <= 1:
+            return {page_num: render_page(pdf_document, page_num, matrix)
+                    for page_num in page_numbers}
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_document,
+                                 initargs=(pdf_document.name,)) as executor:
+            results = executor.map(_render_worker_page, page_numbers,
+                                   [matrix] * len(page_numbers))
+            return dict(results)
+    
+    def get_image_pages(self, pdf_document: fitz.Document) -> List[int]:
+        """Return the indices of pages that contain raster images."""
+        return [page_num for page_num in range(pdf_document.page_count)
+                if pdf_document[page_num].get_images()]
+    
     def compress_image(self, image_data: bytes, quality: int = 85, scale: float = 1.0) -> bytes:
         """
         Compress an image by reducing quality and scale.
@@ -66,9 +240,11 @@ class PDFCompressor:
             
             # Convert to RGB if necessary (for JPEG compatibility)
             if image.mode in ('RGBA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
+                # Flatten transparency onto white in a single composite pass
+                if image.mode == 'P':
+                    image = image.convert('RGBA')
+                background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+                image = Image.alpha_composite(background, image).convert('RGB')
             elif image.mode != 'RGB':
                 image = image.convert('RGB')
             
@@ -78,78 +254,67 @@ class PDFCompressor:
                 image = image.resize(new_size, Image.Resampling.LANCZOS)
             
             # Compress and save to bytes
-            output_buffer = io.BytesIO()
-            image.save(output_buffer, format='JPEG', quality=quality, optimize=True)
-            
-            return output_buffer.getvalue()
+            return encode_jpeg(image, quality)
             
         except Exception as e:
             print(f"Warning: Could not compress image: {e}")
             return image_data
     
-    def compress_pdf_images(self, input_path: str, output_path: str, quality: int = 85, scale: float = 1.0) -> bool:
+    def compress_pdf_images(self, source: Union[str, fitz.Document], output_path: str, quality: int = 85,
+                            scale: float = 1.0, rasters: Optional[Dict[int, Raster]] = None,
+                            optimize: bool = True) -> bool:
         """
         Compress PDF by reducing image quality and scale using page re-rendering.
         
+        Pages with images are rendered once at `scale` (72 * scale DPI) and the
+        JPEG is placed over the full original page rect, so the page keeps its
+        physical size and only its pixel density drops. Pages without images
+        are copied unchanged.
+        
         Args:
-            input_path: Path to input PDF
+            source: Path to input PDF, or an already open document (left open)
             output_path: Path to output PDF
             quality: Image quality (1-100)
             scale: Scale factor (0.1-1.0)
+            rasters: Pages with images already rendered at `scale` (optional).
+                     Lets a quality sweep rasterize each page only once.
+            optimize: Spend extra time on smaller JPEGs (see encode_jpeg)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Open the PDF
-            pdf_document = fitz.open(input_path)
+            # Open the PDF unless the caller already did
+            pdf_document = source if isinstance(source, fitz.Document) else fitz.open(source)
             new_pdf = fitz.open()
             
-            # Calculate matrix for scaling
-            zoom = scale
-            matrix = fitz.Matrix(zoom, zoom)
+            # Render pages that have images (with scaling) unless already done
+            if rasters is None:
+                rasters = self.render_pages(pdf_document, self.get_image_pages(pdf_document), scale)
             
-            # Process each page
+            # Assemble the output document in page order
             for page_num in range(pdf_document.page_count):
                 page = pdf_document[page_num]
                 
-                # Check if page has images
-                image_list = page.get_images()
-                
-                if image_list:
-                    # Render page as image with scaling
-                    pix = page.get_pixmap(matrix=matrix)
-                    
-                    # Convert to JPEG with quality control using Pillow
-                    img_data = pix.tobytes("ppm")  # Get PPM format
-                    
-                    # Use Pillow to convert and compress
-                    pil_image = Image.open(io.BytesIO(img_data))
-                    if pil_image.mode != 'RGB':
-                        pil_image = pil_image.convert('RGB')
-                    
-                    # Compress to JPEG
-                    output_buffer = io.BytesIO()
-                    pil_image.save(output_buffer, format='JPEG', quality=quality, optimize=True)
-                    img_data = output_buffer.getvalue()
+                if page_num in rasters:
+                    img_data = raster_to_jpeg(rasters[page_num], quality, optimize)
                     
-                    # Create new page with the compressed image
-                    new_page = new_pdf.new_page(width=page.rect.width * scale, 
-                                              height=page.rect.height * scale)
+                    # Create new page with the compressed image (original page size)
+                    new_page = new_pdf.new_page(width=page.rect.width, height=page.rect.height)
                     
-                    # Insert the image
-                    img_rect = fitz.Rect(0, 0, new_page.rect.width, new_page.rect.height)
-                    new_page.insert_image(img_rect, stream=img_data)
+                    # Insert the image covering the whole page
+                    new_page.insert_image(new_page.rect, stream=img_data)
                 else:
-                    # Copy page as-is if no images (preserve text/vector graphics)
-                    new_page = new_pdf.new_page(width=page.rect.width * scale, 
-                                              height=page.rect.height * scale)
-                    new_page.show_pdf_page(new_page.rect, pdf_document, page_num)
+                    # Copy page as-is if no images (preserve text/vector graphics).
+                    # Rasterizing these would only make them larger, and
+                    # insert_pdf keeps their original compressed streams.
+                    new_pdf.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
             
             # Save the compressed PDF
-            new_pdf.save(output_path, garbage=4, deflate=True, clean=True)
+            new_pdf.save(output_path, **PDF_SAVE_OPTIONS)
             new_pdf.close()
-            pdf_document.close()
+            if pdf_document is not source:
+                pdf_document.close()
             
             return True
             
@@ -157,60 +322,56 @@ class PDFCompressor:
             print(f"Error compressing PDF: {e}")
             return False
     
-    def compress_pdf_rendering(self, input_path: str, output_path: str, dpi: int = 150, scale: float = 1.0) -> bool:
+    def compress_pdf_rendering(self, source: Union[str, fitz.Document], output_path: str, dpi: int = 150,
+                               scale: float = 1.0, rasters: Optional[Dict[int, Raster]] = None,
+                               optimize: bool = True) -> bool:
         """
         Compress PDF by re-rendering pages at lower DPI.
         
+        Every page is rendered once at `dpi * scale` and the JPEG is placed over
+        the full original page rect, so pages keep their physical size.
+        
         Args:
-            input_path: Path to input PDF
+            source: Path to input PDF, or an already open document (left open)
             output_path: Path to output PDF
             dpi: Target DPI for rendering
             scale: Scale factor for final output
+            rasters: All pages already rendered at `dpi * scale` (optional).
+                     Lets a search encode one rendering several times.
+            optimize: Spend extra time on smaller JPEGs (see encode_jpeg)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Open the PDF
-            pdf_document = fitz.open(input_path)
+            # Open the PDF unless the caller already did
+            pdf_document = source if isinstance(source, fitz.Document) else fitz.open(source)
             new_pdf = fitz.open()
             
-            # Calculate matrix for DPI scaling
+            # Calculate zoom for DPI scaling
             zoom = dpi / 72.0  # 72 is default DPI
-            matrix = fitz.Matrix(zoom * scale, zoom * scale)
             
-            # Process each page
+            # Render every page unless already done
+            if rasters is None:
+                rasters = self.render_pages(pdf_document, list(range(pdf_document.page_count)),
+                                            zoom * scale)
+            
+            # Assemble the output document in page order
             for page_num in range(pdf_document.page_count):
                 page = pdf_document[page_num]
+                img_data = raster_to_jpeg(rasters[page_num], 85, optimize)
                 
-                # Render page as image
-                pix = page.get_pixmap(matrix=matrix)
-                
-                # Convert pixmap to JPEG with quality control using Pillow
-                img_data = pix.tobytes("ppm")  # Get PPM format first
-                
-                # Use Pillow to convert and compress
-                pil_image = Image.open(io.BytesIO(img_data))
-                if pil_image.mode != 'RGB':
-                    pil_image = pil_image.convert('RGB')
+                # Create new page with the image (original page size)
+                new_page = new_pdf.new_page(width=page.rect.width, height=page.rect.height)
                 
-                # Compress to JPEG
-                output_buffer = io.BytesIO()
-                pil_image.save(output_buffer, format='JPEG', quality=85, optimize=True)
-                img_data = output_buffer.getvalue()
-                
-                # Create new page with the image
-                new_page = new_pdf.new_page(width=page.rect.width * scale, 
-                                          height=page.rect.height * scale)
-                
-                # Insert the image
-                img_rect = fitz.Rect(0, 0, new_page.rect.width, new_page.rect.height)
-                new_page.insert_image(img_rect, stream=img_data)
+                # Insert the image covering the whole page
+                new_page.insert_image(new_page.rect, stream=img_data)
             
             # Save the new PDF
-            new_pdf.save(output_path, garbage=4, deflate=True, clean=True)
+            new_pdf.save(output_path, **PDF_SAVE_OPTIONS)
             new_pdf.close()
-            pdf_document.close()
+            if pdf_document is not source:
+                pdf_document.close()
             
             return True
             
@@ -218,6 +379,252 @@ class PDFCompressor:
             print(f"Error in PDF rendering compression: {e}")
             return False
     
+    def search_levels(self, levels: List[int], attempt: Callable[[int, str], Optional[int]],
+                      temp_path: str, skip: Optional[Callable[[int], bool]] = None) -> Optional[int]:
+        """
+        Binary-search compression levels for the first one that fits the target size.
+        
+        Output size is assumed to shrink monotonically along `levels` (e.g.
+        quality levels sorted from highest to lowest), so only about
+        log2(len(levels)) attempts are needed instead of a linear sweep.
+        Every attempt overwrites the same temp file.
+        
+        Args:
+            levels: Compression levels, ordered from largest to smallest output
+            attempt: Callable writing the PDF for a level to the given temp path
+                     and returning its size in bytes, or None on failure
+            temp_path: Temporary file reused by all attempts
+            skip: Callable returning True for levels predicted not to fit (optional).
+                  Those levels are treated as too large without attempting them.
+            
+        Returns:
+            The first fitting level, or None
+        """
+        best_level = None
+        
+        # Find the lowest index that fits (all later levels are assumed to fit too).
+        # Each fitting attempt has a lower index than the previous one, so the
+        # last fitting attempt is the result.
+        low, high = 0, len(levels)
+        while low < high:
+            mid = (low + high) // 2
+            current_size = None if skip and skip(levels[mid]) else attempt(levels[mid], temp_path)
+            
+            if current_size is not None and current_size <= self.target_size_bytes:
+                best_level = levels[mid]
+                high = mid
+            else:
+                low = mid + 1
+        
+        return best_level
+    
+    def measure_attempt(self, compress: Callable[[bool], bool], temp_output: str) -> Optional[int]:
+        """
+        Write one search attempt as cheaply as possible and return its size.
+        
+        The attempt is first written with fast (unoptimized) JPEG encoding.
+        Optimized encoding only makes the output smaller, so a fast result
+        that fits settles the question; only attempts that do not fit are
+        re-encoded with optimization to get their final size.
+        
+        Args:
+            compress: Callable writing the attempt to `temp_output`, taking
+                      the `optimize` flag and returning True on success
+            temp_output: Path the attempt is written to
+            
+        Returns:
+            Size of the written file in bytes, or None on failure
+        """
+        if not compress(False):
+            return None
+        
+        current_size = self.get_file_size(temp_output)
+        if current_size <= self.target_size_bytes:
+            return current_size
+        
+        if not compress(True):
+            return None
+        return self.get_file_size(temp_output)
+    
+    def _estimate_size(self, pixel_count: float, quality: int, bytes_per_pixel: float) -> int:
+        """
+        Roughly estimate the compressed size of `pixel_count` rendered pixels.
+        
+        Args:
+            pixel_count: Number of pixels that will be JPEG-encoded
+            quality: JPEG quality (1-100)
+            bytes_per_pixel: Output bytes per pixel at quality 85, calibrated
+                             from an actual attempt
+            
+        Returns:
+            Estimated output size in bytes
+        """
+        return int(pixel_count * bytes_per_pixel * quality / 85)
+    
+    def _search_image_compression(self, pdf_document: fitz.Document,
+                                  temp_path: str) -> Optional[SearchResult]:
+        """
+        Search image compression settings, from the largest scale down.
+        
+        Attempts whose estimated size is far above the target are skipped;
+        the estimate is calibrated from the first optimized attempt and shared
+        by all scales.
+        
+        Args:
+            pdf_document: Open input document
+            temp_path: Temporary file reused by all attempts
+            
+        Returns:
+            The compress callable and quality level that fit, or None
+        """
+        image_pages = self.get_image_pages(pdf_document)
+        size_model = {}
+        
+        for scale in self.scale_factors:
+            best = self._search_image_scale(pdf_document, image_pages, scale,
+                                            size_model, temp_path)
+            if best:
+                return best
+        return None
+    
+    def _search_image_scale(self, pdf_document: fitz.Document, image_pages: List[int],
+                            scale: float, size_model: dict,
+                            temp_path: str) -> Optional[SearchResult]:
+        """
+        Search the quality levels at one scale of the image compression strategy.
+        
+        Rasterization only depends on the scale, so the image pages are
+        rendered once and re-encoded at the quality levels picked by the search.
+        
+        Args:
+            pdf_document: Open input document
+            image_pages: Indices of the pages with images
+            scale: Scale factor to render at
+            size_model: Size estimate calibration, shared across scales
+            temp_path: Temporary file reused by all attempts
+            
+        Returns:
+            The compress callable and quality level that fit, or None
+        """
+        rasters = self.render_pages(pdf_document, image_pages, scale)
+        pixel_count = sum(width * height for width, height, _ in rasters.values())
+        
+        def compress(quality: int, output: str, optimize: bool) -> bool:
+            return self.compress_pdf_images(pdf_document, output, quality, scale,
+                                            rasters=rasters, optimize=optimize)
+        
+        def attempt(quality: int, temp_output: str) -> Optional[int]:
+            current_size = self.measure_attempt(
+                lambda optimize: compress(quality, temp_output, optimize), temp_output)
+            if current_size is None:
+                return None
+            logger.debug("  Quality %d, Scale %.1f: %s", quality, scale,
+                         self.format_file_size(current_size))
+            if (pixel_count and current_size > self.target_size_bytes
+                    and 'bytes_per_pixel' not in size_model):
+                size_model['bytes_per_pixel'] = current_size * 85 / (pixel_count * quality)
+            return current_size
+        
+        def skip(quality: int) -> bool:
+            if 'bytes_per_pixel' not in size_model:
+                return False
+            estimate = self._estimate_size(pixel_count, quality, size_model['bytes_per_pixel'])
+            if estimate <= 1.5 * self.target_size_bytes:
+                return False
+            logger.debug("  Quality %d, Scale %.1f: skipped (estimated %s)", quality, scale,
+                         self.format_file_size(estimate))
+            return True
+        
+        best_level = self.search_levels(self.quality_levels, attempt, temp_path, skip)
+        return (compress, best_level) if best_level is not None else None
+    
+    def _search_dpi_reduction(self, pdf_document: fitz.Document,
+                              temp_path: str) -> Optional[SearchResult]:
+        """
+        Search page re-rendering DPIs, from the largest scale down.
+        
+        Attempts whose estimated size is far above the target are skipped;
+        the estimate is calibrated from the first optimized attempt and shared
+        by all scales.
+        
+        Args:
+            pdf_document: Open input document
+            temp_path: Temporary file reused by all attempts
+            
+        Returns:
+            The compress callable and DPI level that fit, or None
+        """
+        page_area = sum(page.rect.width * page.rect.height for page in pdf_document)
+        size_model = {}
+        
+        for scale in self.scale_factors:
+            best = self._search_dpi_scale(pdf_document, page_area, scale,
+                                          size_model, temp_path)
+            if best:
+                return best
+        return None
+    
+    def _search_dpi_scale(self, pdf_document: fitz.Document, page_area: float,
+                          scale: float, size_model: dict,
+                          temp_path: str) -> Optional[SearchResult]:
+        """
+        Search the DPI levels at one scale of the DPI reduction strategy.
+        
+        Each DPI is rendered once and re-encoded for the optimized pass. Only
+        the latest rendering is kept in memory, so the final write renders the
+        best fitting DPI again if a later attempt replaced it.
+        
+        Args:
+            pdf_document: Open input document
+            page_area: Total area of all pages in points
+            scale: Scale factor applied on top of the DPI
+            size_model: Size estimate calibration, shared across scales
+            temp_path: Temporary file reused by all attempts
+            
+        Returns:
+            The compress callable and DPI level that fit, or None
+        """
+        dpi_levels = [150, 120, 100, 80, 60, 50]
+        
+        def rendered_pixels(dpi: int) -> float:
+            return page_area * (dpi / 72.0 * scale) ** 2
+        
+        # Latest rendering, keyed by its DPI
+        renderings = {}
+        
+        def compress(dpi: int, output: str, optimize: bool) -> bool:
+            if dpi not in renderings:
+                renderings.clear()
+                renderings[dpi] = self.render_pages(pdf_document, list(range(pdf_document.page_count)),
+                                                    dpi / 72.0 * scale)
+            return self.compress_pdf_rendering(pdf_document, output, dpi, scale,
+                                               rasters=renderings[dpi], optimize=optimize)
+        
+        def attempt(dpi: int, temp_output: str) -> Optional[int]:
+            current_size = self.measure_attempt(
+                lambda optimize: compress(dpi, temp_output, optimize), temp_output)
+            if current_size is None:
+                return None
+            logger.debug("  DPI %d, Scale %.1f: %s", dpi, scale,
+                         self.format_file_size(current_size))
+            if current_size > self.target_size_bytes and 'bytes_per_pixel' not in size_model:
+                size_model['bytes_per_pixel'] = current_size / rendered_pixels(dpi)
+            return current_size
+        
+        def skip(dpi: int) -> bool:
+            if 'bytes_per_pixel' not in size_model:
+                return False
+            estimate = self._estimate_size(rendered_pixels(dpi), 85,
+                                           size_model['bytes_per_pixel'])
+            if estimate <= 1.5 * self.target_size_bytes:
+                return False
+            logger.debug("  DPI %d, Scale %.1f: skipped (estimated %s)", dpi, scale,
+                         self.format_file_size(estimate))
+            return True
+        
+        best_level = self.search_levels(dpi_levels, attempt, temp_path, skip)
+        return (compress, best_level) if best_level is not None else None
+    
     def compress_pdf(self, input_path: str, output_path: Optional[str] = None) -> str:
         """
         Main method to compress PDF to target size.
@@ -248,78 +655,60 @@ class PDFCompressor:
             print("File is already within target size!")
             return output_path
         
-        # Try different compression strategies
-        best_result = None
-        best_size = float('inf')
+        # Try different compression strategies, reusing a single temp file
+        # next to the output so the final rename stays on one filesystem
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf',
+                                              dir=os.path.dirname(os.path.abspath(output_path)))
+        os.close(temp_fd)
         
-        # Strategy 1: Image compression with various quality levels
-        print("\nTrying image compression strategy...")
-        for quality in self.quality_levels:
-            for scale in self.scale_factors:
-                temp_output = f"{output_path}.temp"
-                
-                if self.compress_pdf_images(input_path, temp_output, quality, scale):
-                    current_size = self.get_file_size(temp_output)
-                    
-                    print(f"  Quality {quality}, Scale {scale:.1f}: {self.format_file_size(current_size)}")
-                    
-                    if current_size <= self.target_size_bytes:
-                        if current_size < best_size or best_result is None:
-                            best_result = temp_output
-                            best_size = current_size
-                        break
-                
-                # Clean up temp file if not the best result
-                if os.path.exists(temp_output) and temp_output != best_result:
-                    os.remove(temp_output)
+        pdf_document = None
+        try:
+            # Open the input once; every attempt below renders from this document
+            pdf_document = fitz.open(input_path)
             
-            if best_result:
-                break
-        
-        # Strategy 2: Re-rendering at lower DPI if image compression wasn't enough
-        if not best_result:
-            print("\nTrying DPI reduction strategy...")
-            dpi_levels = [150, 120, 100, 80, 60, 50]
+            # Strategy 1: Image compression with various quality levels
+            logger.debug("Trying image compression strategy...")
+            best = self._search_image_compression(pdf_document, temp_path)
             
-            for dpi in dpi_levels:
-                for scale in self.scale_factors:
-                    temp_output = f"{output_path}.temp2"
-                    
-                    if self.compress_pdf_rendering(input_path, temp_output, dpi, scale):
-                        current_size = self.get_file_size(temp_output)
-                        
-                        print(f"  DPI {dpi}, Scale {scale:.1f}: {self.format_file_size(current_size)}")
-                        
-                        if current_size <= self.target_size_bytes:
-                            if current_size < best_size or best_result is None:
-                                best_result = temp_output
-                                best_size = current_size
-                            break
-                    
-                    # Clean up temp file if not the best result
-                    if os.path.exists(temp_output) and temp_output != best_result:
-                        os.remove(temp_output)
-                
-                if best_result:
-                    break
-        
-        # Finalize the result
-        if best_result:
-            # Move the best result to final output path
-            if best_result != output_path:
-                import shutil
-                shutil.move(best_result, output_path)
+            # Strategy 2: Re-rendering at lower DPI if image compression wasn't enough
+            if not best:
+                logger.debug("Trying DPI reduction strategy...")
+                best = self._search_dpi_reduction(pdf_document, temp_path)
             
-            final_size = self.get_file_size(output_path)
-            compression_ratio = (1 - final_size / original_size) * 100
+            if not best:
+                raise Exception("Could not compress PDF to target size. Try a larger target size.")
             
-            print(f"\n✅ Compression successful!")
-            print(f"Final size: {self.format_file_size(final_size)}")
-            print(f"Compression ratio: {compression_ratio:.1f}%")
+            # Write the winner once more with optimized encoding. In the rare
+            # case that comes out larger than the target, the fast encoding
+            # that passed the search is used instead.
+            compress, best_level = best
+            if (not compress(best_level, temp_path, True)
+                    or self.get_file_size(temp_path) > self.target_size_bytes):
+                if not compress(best_level, temp_path, False):
+                    raise Exception("Could not compress PDF to target size. Try a larger target size.")
             
-            return output_path
-        else:
-            raise Exception("Could not compress PDF to target size. Try a larger target size.")
+            # mkstemp creates owner-only files; give the output the usual permissions
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+            os.replace(temp_path, output_path)
+        finally:
+            if pdf_document is not None:
+                pdf_document.close()
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+        
+        # Report the result
+        final_size = self.get_file_size(output_path)
+        compression_ratio = (1 - final_size / original_size) * 100
+        
+        print(f"\n✅ Compression successful!")
+        print(f"Final size: {self.format_file_size(final_size)}")
+        print(f"Compression ratio: {compression_ratio:.1f}%")
+        
+        return output_path
 
 
 def main():
@@ -329,11 +718,18 @@ def main():
     parser.add_argument("-o", "--output", help="Path to output PDF file")
     parser.add_argument("-s", "--size", type=float, default=1.0, 
                        help="Target size in MB (default: 1.0)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Number of processes used to render pages (default: number of CPUs)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                       help="Show every compression attempt")
     
     args = parser.parse_args()
     
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     try:
-        compressor = PDFCompressor(target_size_mb=args.size)
+        compressor = PDFCompressor(target_size_mb=args.size, max_workers=args.jobs)
         output_file = compressor.compress_pdf(args.input_file, args.output)
         print(f"\nCompressed PDF saved as: {output_file}")
         
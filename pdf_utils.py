@@ -8,11 +8,144 @@ Author: AI Assistant
 """
 
 import os
+import copy
+import shutil
+import array
+import math
+import logging
+import functools
 import fitz  # PyMuPDF
-from typing import List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple, Optional, Union
 from PIL import Image
 import io
 
+from pdf_compressor import can_reopen, init_worker_document, worker_document
+
+logger = logging.getLogger(__name__)
+
+
+def _save_options(fast: bool) -> dict:
+    """
+    Save options for rewriting a whole PDF.
+    
+    The thorough mode runs all garbage collection passes (including merging
+    duplicate objects) and cleans every content stream, which can take long
+    on documents with many objects or pages. Fast mode only drops unused
+    objects and skips the cleaning, for a somewhat larger file.
+    
+    Args:
+        fast: Trade output size for save speed
+        
+    Returns:
+        Keyword arguments for fitz.Document.save
+    """
+    return {
+        'garbage': 1 if fast else 4,
+        'deflate': True,
+        'deflate_images': True,
+        'deflate_fonts': True,
+        'clean': not fast,
+    }
+
+
+# Largest pixmap rendered when flattening a page; larger pages are rendered
+# at a reduced DPI instead of allocating the full bitmap
+MAX_PIXMAP_BYTES = 128 * 1024 * 1024
+
+
+def _full_page_jpeg(page: fitz.Page, dpi: float) -> Optional[bytes]:
+    """
+    Return the embedded JPEG of a page that is nothing but one full-page image.
+    
+    Such pages (typically scans) are flattened by reusing the image stream as
+    is instead of rendering and re-encoding it. The page must draw nothing
+    but that image (invisible OCR text aside, which rendering drops as well),
+    have no annotations, and the image must fill exactly the page, since it
+    is placed over the whole output page. This only happens when the image
+    resolution does not exceed the target DPI, since rendering at that DPI
+    could not reproduce more detail than the image already has.
+    
+    Args:
+        page: Page to inspect
+        dpi: Target DPI for flattening
+        
+    Returns:
+        JPEG image data, or None if the page has to be rendered
+    """
+    if page.rotation or page.first_annot is not None or len(page.get_images()) != 1:
+        return None
+    
+    # Anything else drawn on the page (text, vector graphics, more images)
+    # has to be rendered
+    drawn = [kind for kind, _ in page.get_bboxlog() if kind != 'ignore-text']
+    if drawn != ['fill-image']:
+        return None
+    
+    infos = page.get_image_info(xrefs=True)
+    if len(infos) != 1:
+        return None
+    info = infos[0]
+    
+    # The image must be placed upright, unmasked and fill the page exactly
+    a, b, c, d = info['transform'][:4]
+    if b or c or a <= 0 or d <= 0 or info['has-mask'] or not info['xref']:
+        return None
+    bbox = fitz.Rect(info['bbox'])
+    if max(abs(edge - page_edge) for edge, page_edge in zip(bbox, page.rect)) > 0.5:
+        return None
+    
+    if info['width'] * 72.0 / bbox.width > dpi or info['height'] * 72.0 / bbox.height > dpi:
+        return None
+    
+    base_image = page.parent.extract_image(info['xref'])
+    if base_image.get('ext') != 'jpeg' or base_image.get('colorspace') not in (1, 3):
+        return None
+    return base_image['image']
+
+
+def _render_page_to_jpeg(page: fitz.Page, matrix: fitz.Matrix, quality: int) -> bytes:
+    """
+    Render a page and encode it as JPEG.
+    
+    Args:
+        page: Page to render
+        matrix: Rendering matrix
+        quality: JPEG quality (1-100)
+        
+    Returns:
+        JPEG image data
+    """
+    # Scanned pages already are a JPEG
+    image_data = _full_page_jpeg(page, matrix.a * 72.0)
+    if image_data is not None:
+        return image_data
+    
+    # Keep the page bitmap within MAX_PIXMAP_BYTES
+    page_bytes = page.rect.width * matrix.a * page.rect.height * matrix.d * 3
+    if page_bytes > MAX_PIXMAP_BYTES:
+        zoom = math.sqrt(MAX_PIXMAP_BYTES / (page.rect.width * page.rect.height * 3))
+        logger.warning("Page %d is too large to flatten at %.0f DPI, using %.0f DPI",
+                       page.number + 1, matrix.a * 72.0, zoom * 72.0)
+        matrix = fitz.Matrix(zoom, zoom)
+    
+    # Render page as an opaque RGB pixmap (3 bytes per pixel, as JPEG needs)
+    pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
+    
+    # Wrap the pixmap's own sample buffer (no copy, no PPM round-trip)
+    pil_image = Image.frombuffer('RGB', (pix.width, pix.height), pix.samples_mv,
+                                 'raw', 'RGB', 0, 1)
+    
+    # Compress to JPEG
+    output_buffer = io.BytesIO()
+    pil_image.save(output_buffer, format='JPEG', quality=quality, optimize=True)
+    return output_buffer.getvalue()
+
+
+def _flatten_worker_page(page_num: int, matrix: fitz.Matrix, quality: int) -> Tuple[int, bytes]:
+    """Flatten one page of the worker's document (see init_worker_document) to JPEG."""
+    return page_num, _render_page_to_jpeg(worker_document()[page_num], matrix, quality)
+
 
 class PDFAnalyzer:
     """
@@ -20,81 +153,163 @@ class PDFAnalyzer:
     """
     
     @staticmethod
-    def analyze_pdf(file_path: str) -> dict:
+    def analyze_pdf(source: Union[str, fitz.Document]) -> dict:
         """
         Analyze PDF structure and content to determine best compression strategy.
         
+        Results for a path are cached per file path, modification time and
+        size, so analyzing an unchanged file again does not reopen it. An
+        already open document is analyzed directly (and left open), which
+        lets a pipeline parse the file once for analysis and optimization.
+        
         Args:
-            file_path: Path to PDF file
+            source: Path to PDF file, or an already open document
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        if isinstance(source, fitz.Document):
+            try:
+                if source.stream is not None:
+                    file_size = len(source.stream)
+                else:
+                    file_size = os.path.getsize(source.name) if source.name else 0
+            except OSError as e:
+                return {'error': str(e)}
+            return PDFAnalyzer._analyze_document(source, file_size)
+        
+        file_path = source
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            return {'error': str(e)}
+        
+        analysis = PDFAnalyzer._analyze_file(os.path.abspath(file_path),
+                                             stat.st_mtime_ns, stat.st_size)
+        # Callers get their own copy so they cannot alter the cached result
+        return copy.deepcopy(analysis)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _analyze_file(file_path: str, mtime_ns: int, file_size: int) -> dict:
+        """
+        Analyze a PDF file; cached by analyze_pdf.
+        
+        Args:
+            file_path: Absolute path to PDF file
+            mtime_ns: Modification time of the file (part of the cache key)
+            file_size: Size of the file in bytes
             
         Returns:
             Dictionary with analysis results
         """
         try:
             doc = fitz.open(file_path)
+        except Exception as e:
+            return {'error': str(e)}
+        
+        try:
+            return PDFAnalyzer._analyze_document(doc, file_size)
+        finally:
+            doc.close()
+    
+    @staticmethod
+    def _analyze_document(doc: fitz.Document, file_size: int) -> dict:
+        """
+        Analyze an open PDF document.
+        
+        Args:
+            doc: Open PDF document
+            file_size: Size of the PDF file in bytes
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        try:
+            page_count = doc.page_count
             analysis = {
-                'page_count': doc.page_count,
+                'page_count': page_count,
                 'total_images': 0,
                 'image_sizes': [],
                 'text_heavy': False,
                 'image_heavy': False,
                 'average_dpi': 0,
-                'file_size': os.path.getsize(file_path)
+                'file_size': file_size
             }
             
             total_image_area = 0
             total_page_area = 0
             total_dpi = 0
             dpi_count = 0
+            total_images = 0
+            image_sizes = array.array('Q')
             
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
+            # Stored image sizes by xref, so images shared between pages are read once
+            seen = {}
+            
+            for page in doc:
                 page_area = page.rect.width * page.rect.height
                 total_page_area += page_area
                 
                 # Count images and their properties
                 images = page.get_images()
-                analysis['total_images'] += len(images)
+                total_images += len(images)
                 
-                for img in images:
-                    try:
-                        # Extract image information
-                        xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        
-                        # Calculate image size and DPI
-                        image_bytes = len(base_image["image"])
-                        analysis['image_sizes'].append(image_bytes)
-                        
-                        # Estimate DPI (simplified calculation)
-                        img_width = base_image.get("width", 0)
-                        img_height = base_image.get("height", 0)
+                # Image information comes from the image list and dictionary
+                # (the image stream itself is never decoded)
+                for xref, _, img_width, img_height, *_ in images:
+                    if xref not in seen:
+                        seen[xref] = PDFAnalyzer._image_stream_size(doc, xref)
+                    
+                    # Record image size
+                    image_sizes.append(seen[xref])
+                    
+                    # Estimate DPI (simplified calculation)
+                    if img_width > 0 and img_height > 0:
+                        # Estimate based on image dimensions
+                        estimated_dpi = max(img_width, img_height) / 8.5  # Assume 8.5" max dimension
+                        total_dpi += estimated_dpi
+                        dpi_count += 1
                         
-                        if img_width > 0 and img_height > 0:
-                            # Estimate based on image dimensions
-                            estimated_dpi = max(img_width, img_height) / 8.5  # Assume 8.5" max dimension
-                            total_dpi += estimated_dpi
-                            dpi_count += 1
-                            
-                            image_area = img_width * img_height
-                            total_image_area += image_area
-                            
-                    except Exception:
-                        continue
+                        image_area = img_width * img_height
+                        total_image_area += image_area
+            
+            analysis['total_images'] = total_images
+            analysis['image_sizes'] = image_sizes
             
             # Determine content characteristics
             if total_image_area > 0:
                 analysis['average_dpi'] = total_dpi / dpi_count if dpi_count > 0 else 0
-                image_ratio = total_image_area / (total_page_area * doc.page_count) if total_page_area > 0 else 0
+                image_ratio = total_image_area / (total_page_area * page_count) if total_page_area > 0 else 0
                 analysis['image_heavy'] = image_ratio > 0.3  # More than 30% images
                 analysis['text_heavy'] = image_ratio < 0.1   # Less than 10% images
             
-            doc.close()
             return analysis
             
         except Exception as e:
             return {'error': str(e)}
     
+    @staticmethod
+    def _image_stream_size(doc: fitz.Document, xref: int) -> int:
+        """
+        Read the stored (compressed) size of an image XObject.
+        
+        Args:
+            doc: Open PDF document
+            xref: Image xref number
+            
+        Returns:
+            Size in bytes (0 if the image cannot be read)
+        """
+        try:
+            # /Length may be an indirect object; fall back to the raw stream then
+            value_type, value = doc.xref_get_key(xref, "Length")
+            if value_type == 'int':
+                return int(value)
+            return len(doc.xref_stream_raw(xref))
+        except Exception:
+            return 0
+    
     @staticmethod
     def recommend_strategy(analysis: dict) -> str:
         """
@@ -126,106 +341,177 @@ class PDFOptimizer:
     """
     
     @staticmethod
-    def remove_metadata(input_path: str, output_path: str) -> bool:
+    def remove_metadata(source: Union[str, fitz.Document], output_path: str,
+                        aggressive: bool = False, fast: bool = False) -> bool:
         """
-        Remove metadata to reduce file size.
+        Clear the document metadata (info dictionary and XMP).
+        
+        By default the input is copied and only the cleared metadata is
+        appended to the copy with an incremental save, which writes about a
+        kilobyte regardless of file size, so the output is slightly larger
+        than the input. The previous revision, including
+        the old metadata, stays in the file bytes. With aggressive=True the
+        whole document is rewritten, garbage collected and recompressed,
+        which removes the old metadata for good and usually shrinks the
+        file, at a cost proportional to its size. An open document is
+        rewritten with its metadata cleared in place, unless it can be
+        reopened unchanged from its file (see can_reopen; not the case for
+        password-protected documents), in which case that file is copied
+        as above.
         
         Args:
-            input_path: Path to input PDF
+            source: Path to input PDF, or an already open document (left open)
             output_path: Path to output PDF
+            aggressive: Rewrite and clean up the whole file
+            fast: Rewrite with quicker, less thorough save options
+                  (see _save_options)
             
         Returns:
             True if successful
         """
         try:
-            doc = fitz.open(input_path)
+            is_document = isinstance(source, fitz.Document)
+            input_path = source.name if is_document else source
+            
+            if not aggressive and input_path and (not is_document or can_reopen(source)):
+                shutil.copyfile(input_path, output_path)
+                doc = fitz.open(output_path)
+                
+                # Repaired or otherwise unappendable files get the full rewrite
+                if doc.can_save_incrementally():
+                    doc.set_metadata({})
+                    doc.del_xml_metadata()
+                    doc.save(output_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                    doc.close()
+                    return True
+                doc.close()
+            
+            doc = source if is_document else fitz.open(source)
             
             # Clear metadata
             doc.set_metadata({})
+            doc.del_xml_metadata()
             
             # Save without metadata
-            doc.save(output_path, garbage=4, deflate=True, clean=True)
-            doc.close()
+            doc.save(output_path, **_save_options(fast))
+            if doc is not source:
+                doc.close()
             
             return True
         except Exception:
             return False
     
     @staticmethod
-    def remove_annotations(input_path: str, output_path: str) -> bool:
+    def remove_annotations(source: Union[str, fitz.Document], output_path: str,
+                           fast: bool = False) -> bool:
         """
         Remove annotations and interactive elements.
         
         Args:
-            input_path: Path to input PDF
+            source: Path to input PDF, or an already open document
+                    (left open, with its annotations removed)
             output_path: Path to output PDF
+            fast: Save with quicker, less thorough options (see _save_options)
             
         Returns:
             True if successful
         """
         try:
-            doc = fitz.open(input_path)
+            doc = source if isinstance(source, fitz.Document) else fitz.open(source)
             
             for page in doc:
-                # Remove all annotations
-                annots = page.annots()
-                for annot in annots:
+                # Remove all annotations, walking the annotation list in place
+                annot = page.first_annot
+                while annot:
+                    next_annot = annot.next
                     page.delete_annot(annot)
+                    annot = next_annot
             
-            doc.save(output_path, garbage=4, deflate=True, clean=True)
-            doc.close()
+            doc.save(output_path, **_save_options(fast))
+            if doc is not source:
+                doc.close()
             
             return True
         except Exception:
             return False
     
     @staticmethod
-    def flatten_pdf(input_path: str, output_path: str, dpi: int = 150) -> bool:
+    def flatten_pdf(source: Union[str, fitz.Document], output_path: str, dpi: int = 150,
+                    pages_per_chunk: int = 8, max_workers: Optional[int] = None,
+                    fast: bool = False) -> bool:
         """
         Flatten PDF by converting all content to images (aggressive compression).
         
+        Pages are written in chunks: the first chunk creates the output file and
+        every later chunk is appended with an incremental save, so only one
+        chunk of rendered pages is held in memory regardless of page count.
+        The pages of each chunk are rendered in parallel by worker processes,
+        except for open documents that cannot be reopened from their file
+        (see can_reopen), which are rendered in this process.
+        
         Args:
-            input_path: Path to input PDF
+            source: Path to input PDF, or an already open document (left open)
             output_path: Path to output PDF
             dpi: Target DPI for flattening
+            pages_per_chunk: Number of pages rendered before flushing to disk
+            max_workers: Number of rendering processes
+                         (default: number of CPUs, 1 renders in this process)
+            fast: Save the first chunk with quicker, less thorough options
+                  (see _save_options); later chunks are appended either way
             
         Returns:
             True if successful
         """
         try:
-            doc = fitz.open(input_path)
-            new_doc = fitz.open()
+            doc = source if isinstance(source, fitz.Document) else fitz.open(source)
+            if doc.page_count == 0:
+                raise ValueError("PDF has no pages")
             
             zoom = dpi / 72.0
             matrix = fitz.Matrix(zoom, zoom)
             
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                
-                # Render page as pixmap
-                pix = page.get_pixmap(matrix=matrix)
-                
-                # Convert pixmap to JPEG using Pillow for quality control
-                img_data = pix.tobytes("ppm")  # Get PPM format
-                
-                # Use Pillow to convert and compress
-                pil_image = Image.open(io.BytesIO(img_data))
-                if pil_image.mode != 'RGB':
-                    pil_image = pil_image.convert('RGB')
-                
-                # Compress to JPEG
-                output_buffer = io.BytesIO()
-                pil_image.save(output_buffer, format='JPEG', quality=85, optimize=True)
-                img_data = output_buffer.getvalue()
-                
-                # Create new page
-                new_page = new_doc.new_page(width=page.rect.width, height=page.rect.height)
-                img_rect = new_page.rect
-                new_page.insert_image(img_rect, stream=img_data)
+            # Workers reopen the document from its file
+            workers = min(max_workers or os.cpu_count() or 1, doc.page_count)
+            executor = None
+            if workers > 1 and can_reopen(doc):
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_document,
+                                               initargs=(doc.name,))
             
-            new_doc.save(output_path, garbage=4, deflate=True, clean=True)
-            new_doc.close()
-            doc.close()
+            try:
+                for chunk_start in range(0, doc.page_count, pages_per_chunk):
+                    page_numbers = range(chunk_start, min(chunk_start + pages_per_chunk, doc.page_count))
+                    
+                    # Render the chunk's pages, in parallel if possible
+                    if executor:
+                        images = dict(executor.map(_flatten_worker_page, page_numbers,
+                                                   [matrix] * len(page_numbers),
+                                                   [85] * len(page_numbers)))
+                    else:
+                        images = {page.number: _render_page_to_jpeg(page, matrix, 85)
+                                  for page in doc.pages(page_numbers.start, page_numbers.stop)}
+                    
+                    # Start the output with the first chunk, then reopen it to append
+                    new_doc = fitz.open() if chunk_start == 0 else fitz.open(output_path)
+                    
+                    for page in doc.pages(page_numbers.start, page_numbers.stop):
+                        # Create new page
+                        new_page = new_doc.new_page(width=page.rect.width, height=page.rect.height)
+                        img_rect = new_page.rect
+                        new_page.insert_image(img_rect, stream=images[page.number])
+                    
+                    # Flush the chunk to disk
+                    if chunk_start == 0:
+                        new_doc.save(output_path, **_save_options(fast))
+                    else:
+                        new_doc.save(output_path, incremental=True, deflate=True,
+                                     encryption=fitz.PDF_ENCRYPT_KEEP)
+                    new_doc.close()
+            finally:
+                if executor:
+                    executor.shutdown()
+            
+            if doc is not source:
+                doc.close()
             
             return True
         except Exception:
@@ -249,36 +535,57 @@ class ImageProcessor:
             min_quality: Minimum acceptable quality
             
         Returns:
-            Optimized image bytes
+            Optimized image bytes (the original bytes if they already fit)
         """
         try:
+            # Nothing to do for images that already fit
+            if len(image_data) <= target_size:
+                return image_data
+            
             image = Image.open(io.BytesIO(image_data))
             
             # Convert to RGB if necessary
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
+            # Every probe encodes into the same buffer; bytes are only
+            # copied out for encodes that fit
+            buffer = io.BytesIO()
+            
+            def encode_if_fits(img: Image.Image, quality: int) -> Optional[bytes]:
+                buffer.seek(0)
+                buffer.truncate(0)
+                img.save(buffer, format='JPEG', quality=quality, optimize=True)
+                return buffer.getvalue() if buffer.tell() <= target_size else None
+            
             # Try different quality levels
-            for quality in range(95, min_quality - 1, -5):
-                output = io.BytesIO()
-                image.save(output, format='JPEG', quality=quality, optimize=True)
-                
-                if len(output.getvalue()) <= target_size:
-                    return output.getvalue()
+            qualities = list(range(95, min_quality - 1, -5))
+            result = ImageProcessor._highest_fitting_quality(
+                image, qualities, encode_if_fits)
+            if result is not None:
+                return result[1]
             
             # If still too large, try resizing
             scale_factors = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
+            qualities = list(range(85, min_quality - 1, -5))
             
             for scale in scale_factors:
                 new_size = (int(image.width * scale), int(image.height * scale))
-                resized = image.resize(new_size, Image.Resampling.LANCZOS)
                 
-                for quality in range(85, min_quality - 1, -5):
-                    output = io.BytesIO()
-                    resized.save(output, format='JPEG', quality=quality, optimize=True)
-                    
-                    if len(output.getvalue()) <= target_size:
-                        return output.getvalue()
+                # Probe the scale with a cheap bilinear resize
+                resized = image.resize(new_size, Image.Resampling.BILINEAR)
+                result = ImageProcessor._highest_fitting_quality(
+                    resized, qualities, encode_if_fits)
+                if result is None:
+                    continue
+                
+                # Redo the accepted scale with Lanczos, starting from the
+                # quality the probe found
+                quality, probe_data = result
+                resized = image.resize(new_size, Image.Resampling.LANCZOS)
+                result = ImageProcessor._highest_fitting_quality(
+                    resized, qualities[qualities.index(quality):], encode_if_fits)
+                return result[1] if result is not None else probe_data
             
             # Fallback: return heavily compressed version
             output = io.BytesIO()
@@ -291,6 +598,50 @@ class ImageProcessor:
         except Exception:
             return image_data
     
+    @staticmethod
+    def _highest_fitting_quality(image: Image.Image, qualities: List[int],
+                                 encode_if_fits: Callable[[Image.Image, int],
+                                                          Optional[bytes]]
+                                 ) -> Optional[Tuple[int, bytes]]:
+        """
+        Find the encode at the highest quality that fits the target size.
+        
+        JPEG size grows with quality, so the qualities (highest first) are
+        bisected instead of tried one by one. Both ends are probed first,
+        so images that already fit or cannot fit cost at most two encodes.
+        
+        Args:
+            image: Image to encode
+            qualities: Candidate qualities, highest first
+            encode_if_fits: Function encoding an image at a given quality,
+                returning the bytes only if they fit the target size
+            
+        Returns:
+            Tuple of (quality, encoded bytes), or None if no quality fits
+        """
+        if not qualities:
+            return None
+        
+        best = encode_if_fits(image, qualities[0])
+        if best is not None:
+            return qualities[0], best
+        
+        best = encode_if_fits(image, qualities[-1])
+        if best is None:
+            return None
+        
+        # qualities[lo - 1] is known not to fit and qualities[hi] to fit
+        lo, hi = 1, len(qualities) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            data = encode_if_fits(image, qualities[mid])
+            if data is not None:
+                best, hi = data, mid
+            else:
+                lo = mid + 1
+        
+        return qualities[hi], best
+    
     @staticmethod
     def calculate_optimal_dpi(original_size: int, target_size: int, 
                             current_dpi: int = 300) -> int:
@@ -305,14 +656,13 @@ class ImageProcessor:
         Returns:
             Recommended DPI
         """
-        # Simple ratio-based calculation
-        size_ratio = target_size / original_size
-        
         # DPI reduction roughly proportional to square root of size ratio
-        # (since DPI affects both width and height)
-        dpi_ratio = size_ratio ** 0.5
-        
-        optimal_dpi = int(current_dpi * dpi_ratio)
+        # (since DPI affects both width and height), computed exactly in
+        # integers as isqrt(current_dpi^2 * target_size / original_size).
+        # Sizes may be floats (e.g. PDFCompressor.target_size_bytes).
+        original_size, target_size, current_dpi = int(original_size), int(target_size), int(current_dpi)
+        optimal_dpi = math.isqrt(target_size * current_dpi * current_dpi
+                                 // max(original_size, 1))
         
         # Ensure reasonable bounds
-        return max(50, min(optimal_dpi, 300)) 
\ No newline at end of file
+        return 50 if optimal_dpi < 50 else 300 if optimal_dpi > 300 else optimal_dpi 
\ No newline at end of file
@@ -104,9 +104,10 @@ def test_pdf_creation():
         
         print(f"✅ Test PDF created: {test_pdf_path}")
         
-        # Test analysis on the created PDF
+        # Test analysis on the created PDF (opened once, passed as a document)
         from pdf_utils import PDFAnalyzer
-        analysis = PDFAnalyzer.analyze_pdf(test_pdf_path)
+        with fitz.open(test_pdf_path) as test_doc:
+            analysis = PDFAnalyzer.analyze_pdf(test_doc)
         
         if 'error' not in analysis:
             print(f"✅ PDF analysis successful: {analysis['page_count']} pages")